@@ -2,14 +2,27 @@ from ncatbot.plugin_system import NcatBotPlugin, command_registry, param, admin_
 from ncatbot.plugin_system.builtin_plugin.unified_registry.command_system.registry.help_system import HelpGenerator
 from ncatbot.utils import get_log
 from ncatbot.core import BaseMessageEvent, GroupMessageEvent, MessageSentEvent, Reply
+from ncatbot.core.event import PlainText
 
-from .resolvers.base_resolver import resolve_link
-from .render import render_link_result
+from .resolvers.base_resolver import BaseResolver, normalize_url, resolve_link
+from .render import MAX_CONCURRENT_RENDERS, cleanup_temp_dir, load_style, render_link_result
+from collections import OrderedDict
 from pathlib import Path
 from io import BytesIO
-import base64
-from .utils import extract_urls, require_subscription
+from typing import Optional
+import asyncio
+import time
+try:
+    import pybase64 as base64  # SIMD 加速的 base64 实现，接口与标准库一致
+except ImportError:
+    import base64
+from .utils import extract_urls, invalidate_subscription, require_subscription, subscribed_check
 
+# 渲染结果缓存容量、总字节上限与过期时间（秒）
+# 单张渲染图的base64约2~3MB，仅按条数限制会占用数百MB内存
+RENDER_CACHE_SIZE = 128
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RENDER_CACHE_TTL = 600
 
 
 class LinkResolver(NcatBotPlugin):
@@ -31,9 +44,28 @@ class LinkResolver(NcatBotPlugin):
     async def on_load(self):
         """插件加载时执行"""
         self.init_config()
+        # 归一化 URL -> (写入时间, 图片base64)
+        self._render_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._render_cache_bytes = 0  # 缓存中base64字符串的总长度
+        # 同一链接并发解析时只渲染一次；锁按持有和等待的请求数计数，归零时才移除
+        self._render_locks: dict[str, asyncio.Lock] = {}
+        self._render_lock_refs: dict[str, int] = {}
+        # 所有解析器共用的HTTP会话，复用连接池和DNS缓存
+        self.http = await BaseResolver.get_session()
+        # 预先加载渲染样式，资源未就绪时留到首次渲染再加载
+        try:
+            self.mdstyle = load_style(Path(self.workspace) / "resources" / "mdstyle")
+        except Exception as e:
+            self.mdstyle = None
+            self.log.warning(f"加载渲染样式失败，请确认 resources 已解压: {e}")
         self.log.info(f"{self.name} v{self.version} 加载成功")
         self.log.info(f"已订阅群聊: {self.config['subscribed_groups']}")
 
+    async def on_close(self):
+        """插件卸载时执行"""
+        await BaseResolver.close_session()
+        cleanup_temp_dir()
+
     # ======== 命令注册 ========
     link_group = command_registry.group("link", description="链接解析相关命令")
 
@@ -52,18 +84,31 @@ class LinkResolver(NcatBotPlugin):
             return  # 忽略自身上报消息，此问题已在ncatbot4.3.0修复
         if not self.config["auto_parse"]:
             return
-        texts = event.message.filter_text()
-        if texts and texts[0].text.startswith("/"):
-            return
-        if event.message.filter(Reply):
+        raw_message = event.raw_message
+        if "http" not in raw_message:
+            return  # 不可能包含链接，跳过后续解析
+        # 单次遍历消息段：跳过回复消息和以命令开头的消息
+        first_text = None
+        for segment in event.message.messages:
+            if isinstance(segment, Reply):
+                return
+            if first_text is None and isinstance(segment, PlainText):
+                first_text = segment.text
+        if first_text is not None and first_text.startswith("/"):
             return
-        raw_message = event.raw_message.replace("\\", "")
+        if "\\" in raw_message:
+            raw_message = raw_message.replace("\\", "")
         urls = extract_urls(raw_message)
         if len(urls) == 0:
             return
-        for url in urls:
-            
-            await self._resolve_link(event, url)
+        # 多个链接并发解析，信号量限制同时进行的渲染数
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_RENDERS)
+
+        async def resolve_one(url: str):
+            async with semaphore:
+                await self._resolve_link(event, url)
+
+        await asyncio.gather(*(resolve_one(url) for url in urls))
 
 
     # ======== 订阅功能 ========
@@ -73,16 +118,18 @@ class LinkResolver(NcatBotPlugin):
         """订阅聚合链接解析功能"""
         if isinstance(event, GroupMessageEvent):
             subscribed_groups = self.config["subscribed_groups"]
-            if str(event.group_id) in subscribed_groups:
+            if subscribed_check(subscribed_groups, event.group_id):
                 await event.reply("本群组已订阅聚合链接解析功能喵~")
                 return
-            self.config["subscribed_groups"].append(str(event.group_id))
+            subscribed_groups.append(str(event.group_id))
+            invalidate_subscription(subscribed_groups)
         else:
             subscribed_privates = self.config["subscribed_privates"]
-            if str(event.user_id) in subscribed_privates:
+            if subscribed_check(subscribed_privates, event.user_id):
                 await event.reply("您已订阅聚合链接解析功能喵~")
                 return
-            self.config["subscribed_privates"].append(str(event.user_id))
+            subscribed_privates.append(str(event.user_id))
+            invalidate_subscription(subscribed_privates)
         await event.reply("订阅了聚合链接解析功能喵~")
 
 
@@ -92,16 +139,16 @@ class LinkResolver(NcatBotPlugin):
         """取消订阅聚合链接解析功能"""
         if isinstance(event, GroupMessageEvent):
             subscribed_groups = self.config["subscribed_groups"]
-            if str(event.group_id) not in subscribed_groups:
+            if not subscribed_check(subscribed_groups, event.group_id):
                 await event.reply("本群组未订阅聚合链接解析功能喵~")
                 return
-            self.config["subscribed_groups"].remove(str(event.group_id))
+            self._remove_subscription(subscribed_groups, str(event.group_id))
         else:
             subscribed_privates = self.config["subscribed_privates"]
-            if str(event.user_id) not in subscribed_privates:
+            if not subscribed_check(subscribed_privates, event.user_id):
                 await event.reply("您未订阅聚合链接解析功能喵~")
                 return
-            self.config["subscribed_privates"].remove(str(event.user_id))
+            self._remove_subscription(subscribed_privates, str(event.user_id))
         await event.reply("取消订阅了聚合链接解析功能喵~")
 
 
@@ -126,27 +173,93 @@ class LinkResolver(NcatBotPlugin):
             await event.reply(f"生成帮助信息时出错了喵：\n{e}")
     
     # ===== 内部方法 =====
+    @staticmethod
+    def _remove_subscription(subscribed: list, target_id: str):
+        """从配置列表中移除订阅，兼容手动写入的非字符串ID"""
+        subscribed[:] = [s for s in subscribed if str(s) != target_id]
+        invalidate_subscription(subscribed)
+
+    def _get_cached_render(self, key: str) -> Optional[str]:
+        """读取未过期的渲染缓存"""
+        cached = self._render_cache.get(key)
+        if cached is None:
+            return None
+        if time.monotonic() - cached[0] > RENDER_CACHE_TTL:
+            del self._render_cache[key]
+            self._render_cache_bytes -= len(cached[1])
+            return None
+        self._render_cache.move_to_end(key)
+        return cached[1]
+
+    def _put_cached_render(self, key: str, img_b64: str):
+        """写入渲染缓存，超出条数或总字节上限时淘汰最久未使用的条目"""
+        if len(img_b64) > RENDER_CACHE_MAX_BYTES:
+            return  # 单张图片已超出上限，不缓存
+        old = self._render_cache.pop(key, None)
+        if old is not None:
+            self._render_cache_bytes -= len(old[1])
+        self._render_cache[key] = (time.monotonic(), img_b64)
+        self._render_cache_bytes += len(img_b64)
+        while (len(self._render_cache) > RENDER_CACHE_SIZE
+               or self._render_cache_bytes > RENDER_CACHE_MAX_BYTES):
+            _, (_, evicted) = self._render_cache.popitem(last=False)
+            self._render_cache_bytes -= len(evicted)
+
+    async def _render_link(self, url: str) -> Optional[str]:
+        """解析并渲染链接，返回图片的base64编码，无法解析时返回None"""
+        key = normalize_url(url)
+        img_b64 = self._get_cached_render(key)
+        if img_b64 is not None:
+            return img_b64
+
+        lock = self._render_locks.get(key)
+        if lock is None:
+            lock = self._render_locks[key] = asyncio.Lock()
+        self._render_lock_refs[key] = self._render_lock_refs.get(key, 0) + 1
+        try:
+            async with lock:
+                # 等待期间可能已由其他请求渲染完成
+                img_b64 = self._get_cached_render(key)
+                if img_b64 is not None:
+                    return img_b64
+
+                # 使用resolver解析链接
+                results = await resolve_link(url, session=self.http)
+                if not results:
+                    return None
+
+                # 渲染第一个结果
+                result = results[0]
+                resources_path = Path(self.workspace) / "resources"
+                images = await render_link_result(result, self.version, resources_path, self.mdstyle)
+                if not images:
+                    return None
+
+                # 将图片转换为base64
+                img_bytes = BytesIO()
+                images[0].save(img_bytes, format='PNG', compress_level=1, optimize=False)
+                # getbuffer 直接引用内部缓冲区，省去 getvalue 的一次整体拷贝
+                with img_bytes.getbuffer() as img_view:
+                    img_b64 = base64.b64encode(img_view).decode('ascii')
+                # 解析结果不完整（如封面下载失败）时不缓存，下次重新解析
+                if result.cacheable:
+                    self._put_cached_render(key, img_b64)
+                return img_b64
+        finally:
+            # 释放锁到等待者重新获取之间 locked() 为 False，因此按引用计数判断是否还有等待者
+            refs = self._render_lock_refs[key] - 1
+            if refs:
+                self._render_lock_refs[key] = refs
+            else:
+                del self._render_lock_refs[key]
+                del self._render_locks[key]
+
     async def _resolve_link(self, event: BaseMessageEvent, url: str):
         try:
-            # 使用resolver解析链接
-            results = await resolve_link(url)
-            
-            if not results:
+            img_b64 = await self._render_link(url)
+            if not img_b64:
                 return
             
-            # 渲染第一个结果
-            result = results[0]
-            resources_path = Path(self.workspace) / "resources"
-            images = await render_link_result(result, self.version, resources_path)
-            
-            if not images:
-                return
-            
-            # 将图片转换为base64并发送
-            img_bytes = BytesIO()
-            images[0].save(img_bytes, format='PNG')
-            img_b64 = base64.b64encode(img_bytes.getvalue()).decode('utf-8')
-            
             # 使用api发送图片
             group_id = getattr(event, 'group_id', None)
             if group_id:
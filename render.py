@@ -1,6 +1,12 @@
-from typing import List
+from typing import List, Optional
 from PIL import Image
 from pathlib import Path
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import uuid
 
 import pillowmd
 
@@ -9,11 +15,97 @@ try:
 except ImportError:
     from resolvers.base_resolver import ParseResult
 
+# 内存文件系统（tmpfs），存在时用于存放 pillowmd 读取的临时卡片图片
+SHM_PATH = Path("/dev/shm")
+# 同时渲染的最大链接数
+MAX_CONCURRENT_RENDERS = 4
+
+
+# 本进程在内存文件系统中创建的私有临时目录，首次渲染时创建
+_shm_temp_dir: Optional[Path] = None
+
+
+def _get_temp_dir(resources_path: Path) -> Path:
+    """获取临时图片目录
+
+    pillowmd 的 !sgm[] 只能从 QUICK_IMAGE_PATH 目录按文件名读取图片，无法直接传入内存中的图片，
+    因此优先使用内存文件系统，避免卡片图片落盘。/dev/shm 由主机上所有进程和用户共享，
+    这里为本进程单独创建目录（权限 0700），不会与其他实例冲突。不可用时回退到资源目录旁的 temp 文件夹。
+    """
+    global _shm_temp_dir
+    if _shm_temp_dir is not None and os.access(_shm_temp_dir, os.W_OK):
+        return _shm_temp_dir
+    _shm_temp_dir = None
+    if SHM_PATH.is_dir():
+        try:
+            _shm_temp_dir = Path(tempfile.mkdtemp(prefix="LinkResolver-", dir=SHM_PATH))
+            return _shm_temp_dir
+        except OSError:
+            pass
+    temp_dir = resources_path.parent / "temp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    return temp_dir
+
+
+def cleanup_temp_dir():
+    """删除本进程在内存文件系统中创建的临时目录，插件卸载时调用"""
+    global _shm_temp_dir
+    if _shm_temp_dir is not None:
+        shutil.rmtree(_shm_temp_dir, ignore_errors=True)
+        _shm_temp_dir = None
+
+def _card_path(temp_dir: Path) -> Path:
+    """生成本次渲染独占的卡片文件路径
+
+    渲染结束后即删除；同一链接可能被并发渲染，因此不按链接命名，避免互相覆盖或提前删除。
+    """
+    return temp_dir / f"card_{uuid.uuid4().hex}.png"
+
+
+# 样式路径 -> 已解析的 pillowmd 样式
+_style_cache: dict[str, pillowmd.MdStyle] = {}
+_style_lock = threading.Lock()
+
+
+def load_style(style_path: Path) -> pillowmd.MdStyle:
+    """加载 pillowmd 样式，同一路径只解析一次
+
+    Args:
+        style_path: 样式文件夹路径
+
+    Returns:
+        pillowmd 样式对象
+    """
+    key = str(style_path)
+    style = _style_cache.get(key)
+    if style is None:
+        with _style_lock:
+            style = _style_cache.get(key)
+            if style is None:
+                style = pillowmd.LoadMarkdownStyles(key)
+                _style_cache[key] = style
+    return style
+
+
+def _md_to_image(markdown_text: str, style: pillowmd.MdStyle):
+    """在工作线程中同步执行 pillowmd 渲染
+
+    MdToImage 虽然是协程，但除下载网络图片外全部是同步的 Pillow 绘制，
+    这里在独立的事件循环中运行它，使渲染不占用主事件循环。
+    """
+    return asyncio.run(pillowmd.MdToImage(
+        text=markdown_text,
+        style=style,
+        sgm=True,
+        sgexter=True
+    ))
+
 
 async def render_link_result(
     parse_result: ParseResult,
     plugin_version: str,
-    resources_path: Path = Path("data/LinkResolver/resources")
+    resources_path: Path = Path("data/LinkResolver/resources"),
+    style: Optional[pillowmd.MdStyle] = None
 ) -> List[Image.Image]:
     """
     将链接解析结果渲染为图片,使用 pillowmd 渲染 Markdown 格式
@@ -22,23 +114,25 @@ async def render_link_result(
         parse_result: 链接解析结果
         plugin_version: 插件版本信息(这里用于显示平台信息)
         resources_path: 资源文件夹路径(包含 mdstyle 文件夹)
+        style: 预先加载的 pillowmd 样式，为空时从 resources_path 加载并缓存
         
     Returns:
         渲染后的图片列表
     """
     
     # 确保临时文件夹存在
-    temp_dir = resources_path.parent / "temp"
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    temp_dir = _get_temp_dir(resources_path)
     
     pillowmd.Setting.QUICK_IMAGE_PATH = temp_dir
-    temp_pics: list[Path] = []
     
-    # 使用ParseResult的方法生成卡片
-    card_bytes = parse_result.generate_card_image()
-    card_path = temp_dir / f"card_{hash(parse_result.url)}.png"
+    # 加载样式（放在写入卡片之前，加载失败时不会留下临时文件）
+    if style is None:
+        style = load_style(resources_path / "mdstyle")
+    
+    # 使用ParseResult的方法生成卡片（CPU密集，放到线程中执行避免阻塞事件循环）
+    card_bytes = await asyncio.to_thread(parse_result.generate_card_image)
+    card_path = _card_path(temp_dir)
     card_path.write_bytes(card_bytes)
-    temp_pics.append(card_path)
     
     # 构建 Markdown 文本
     markdown_parts = []
@@ -61,16 +155,11 @@ async def render_link_result(
     # 组合完整的 Markdown 文本
     markdown_text = "".join(markdown_parts)
     
-    # 加载样式并渲染
-    style_path = resources_path / "mdstyle"
-    style = pillowmd.LoadMarkdownStyles(str(style_path))
-    
-    result = await pillowmd.MdToImage(
-        text=markdown_text,
-        style=style,
-        sgm=True,
-        sgexter=True
-    )
+    # 渲染；pillowmd 每次渲染都会列出 QUICK_IMAGE_PATH 目录，卡片用完立即删除，避免目录中文件堆积
+    try:
+        result = await asyncio.to_thread(_md_to_image, markdown_text, style)
+    finally:
+        card_path.unlink(missing_ok=True)
     
     # 从渲染结果中获取图片
     if result.imageType == 'gif':
@@ -78,17 +167,14 @@ async def render_link_result(
     else:
         base_images = [result.image]
     
-    # 删除临时图片文件
-    for temp_pic in temp_pics:
-        temp_pic.unlink(missing_ok=True)
-    
     return base_images
 
 
 async def render_multiple_results(
     parse_results: List[ParseResult],
     plugin_version: str,
-    resources_path: Path = Path("data/LinkResolver/resources")
+    resources_path: Path = Path("data/LinkResolver/resources"),
+    style: Optional[pillowmd.MdStyle] = None
 ) -> List[Image.Image]:
     """
     渲染多个链接解析结果
@@ -97,19 +183,27 @@ async def render_multiple_results(
         parse_results: 链接解析结果列表
         plugin_version: 插件版本信息
         resources_path: 资源文件夹路径
+        style: 预先加载的 pillowmd 样式
         
     Returns:
         渲染后的图片列表
     """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_RENDERS)
+
+    async def render_one(result: ParseResult) -> List[Image.Image]:
+        async with semaphore:
+            return await render_link_result(result, plugin_version, resources_path, style)
+
+    # 并发渲染，gather 保证结果顺序与输入一致
+    images_list = await asyncio.gather(*(render_one(result) for result in parse_results))
     all_images = []
-    for result in parse_results:
-        images = await render_link_result(result, plugin_version, resources_path)
+    for images in images_list:
         all_images.extend(images)
     return all_images
 
 
 if __name__ == "__main__":
-    import asyncio
+    from resolvers.base_resolver import BaseResolver
     from resolvers.bilibili import BilibiliResolver
     
     async def test():
@@ -146,5 +240,8 @@ if __name__ == "__main__":
             print(f"GIF已保存到: {gif_path}")
         
         print("\n✅ 测试完成!")
+        
+        # parse 未传入 session 时会创建共享会话，测试结束后关闭
+        await BaseResolver.close_session()
     
     asyncio.run(test())
@@ -1,10 +1,48 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
+from collections import OrderedDict
 from typing import Any, Optional, Type
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import aiohttp
+import time
 from ncatbot.utils import get_log
 
+try:
+    import fpng_py  # SIMD 加速的 PNG 编码器
+except ImportError:
+    fpng_py = None
+
 LOG = get_log("LinkResolver")
 
+# 解析结果缓存容量与过期时间（秒）
+PARSE_CACHE_SIZE = 256
+PARSE_CACHE_TTL = 600
+
+# 不影响内容的跟踪参数，归一化 URL 时剔除
+TRACKING_PARAMS = frozenset({
+    "spm_id_from", "from_spmid", "vd_source", "share_source", "share_medium",
+    "share_plat", "share_session_id", "share_tag", "share_from", "bbid", "ts",
+    "unique_k", "timestamp", "from",
+})
+
+def normalize_url(url: str) -> str:
+    """归一化 URL，用作缓存键
+
+    小写主机名，去掉跟踪参数和锚点。
+
+    Args:
+        url: 原始 URL
+
+    Returns:
+        归一化后的 URL，无法解析时原样返回
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in TRACKING_PARAMS]
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, urlencode(query), ""))
+
 @dataclass
 class ParseResult:
     title: str
@@ -15,6 +53,8 @@ class ParseResult:
     metadata: Optional[dict[str, dict[str, Any]]] = None
     pre_init_images: Optional[list[str]] = field(default_factory=list)
     card_color: tuple[int, int, int] = (255, 255, 255)  # 卡片背景颜色 RGB
+    banner_bytes: Optional[bytes] = field(default=None, repr=False)  # 封面原始图片数据，优先于 banner_b64 使用
+    cacheable: bool = field(default=True, compare=False)  # 图片等资源下载不完整时为 False，结果不会被缓存
     
     def generate_card_image(self, target_width: int = 1200) -> bytes:
         """生成整合了banner和信息图的卡片图片
@@ -27,7 +67,7 @@ class ParseResult:
         """
         import base64
         from io import BytesIO
-        from PIL import Image, ImageFilter
+        from PIL import Image, ImageDraw
         
         padding = 24
         border_width = 1
@@ -37,29 +77,28 @@ class ParseResult:
         # 图片最大宽度（直接使用目标宽度，不留padding）
         img_max_width = target_width
         
-        # 准备所有图片组件
+        # 先解码所有图片组件，再统一缩放
+        # 解码结果不缓存在实例上：ParseResult 会被解析缓存长期持有，完整的RGBA图片占用内存过大
         images = []
         
         # 添加封面
-        if self.banner_b64:
-            banner_data = base64.b64decode(self.banner_b64)
-            banner_img = Image.open(BytesIO(banner_data)).convert('RGBA')
-            if banner_img.width != img_max_width:
-                scale = img_max_width / banner_img.width
-                new_height = int(banner_img.height * scale)
-                banner_img = banner_img.resize((img_max_width, new_height), Image.Resampling.LANCZOS)
-            images.append(banner_img)
+        if self.banner_bytes or self.banner_b64:
+            banner_data = self.banner_bytes or base64.b64decode(self.banner_b64)
+            images.append(Image.open(BytesIO(banner_data)).convert('RGBA'))
         
         # 添加信息图
         if self.pre_init_images:
             for img_b64 in self.pre_init_images:
                 img_data = base64.b64decode(img_b64)
-                info_img = Image.open(BytesIO(img_data)).convert('RGBA')
-                if info_img.width != img_max_width:
-                    scale = img_max_width / info_img.width
-                    new_height = int(info_img.height * scale)
-                    info_img = info_img.resize((img_max_width, new_height), Image.Resampling.LANCZOS)
-                images.append(info_img)
+                images.append(Image.open(BytesIO(img_data)).convert('RGBA'))
+        
+        # 缩放到目标宽度：小幅缩小时BILINEAR与LANCZOS观感无差别且更快，大幅缩小或放大时仍用LANCZOS
+        for i, img in enumerate(images):
+            if img.width != img_max_width:
+                scale = img_max_width / img.width
+                new_height = int(img.height * scale)
+                resample = Image.Resampling.BILINEAR if 0.7 <= scale < 1 else Image.Resampling.LANCZOS
+                images[i] = img.resize((img_max_width, new_height), resample)
         
         # 计算总高度
         total_height = 0
@@ -69,24 +108,36 @@ class ParseResult:
         # 直接创建画布，不添加padding和阴影
         canvas = Image.new('RGBA', (target_width, total_height), (0, 0, 0, 0))
         
-        # 粘贴所有图片
+        # 粘贴所有图片：边框直接画在画布上，不再为每张图片创建带边框的中间图
+        draw = ImageDraw.Draw(canvas)
         current_y = 0
         for img in images:
-            # 添加边框
-            bordered_img = Image.new('RGBA', (img.width + border_width * 2, img.height + border_width * 2), border_color)
-            bordered_img.paste(img, (border_width, border_width))
+            outer_width = img.width + border_width * 2
+            outer_height = img.height + border_width * 2
             
             # 居中粘贴
-            x_offset = (target_width - bordered_img.width) // 2
-            canvas.paste(bordered_img, (x_offset, current_y), bordered_img if bordered_img.mode == 'RGBA' else None)
-            current_y += bordered_img.height
+            x_offset = (target_width - outer_width) // 2
+            draw.rectangle(
+                [(x_offset, current_y), (x_offset + outer_width - 1, current_y + outer_height - 1)],
+                outline=border_color,
+                width=border_width
+            )
+            canvas.paste(img, (x_offset + border_width, current_y + border_width), img)
+            current_y += outer_height
         
         # 转换为bytes
+        if fpng_py is not None:
+            return fpng_py.fpng_encode_image_to_memory(canvas.tobytes(), canvas.width, canvas.height, 4)
         output = BytesIO()
-        canvas.save(output, format='PNG')
+        # 低压缩级别体积相近但编码快得多
+        canvas.save(output, format='PNG', compress_level=1, optimize=False)
         return output.getvalue()
 
 _resolvers_registry: list["BaseResolver"] = []
+# 域名 -> 解析器，用于按域名直接分发
+_resolvers_by_host: dict[str, "BaseResolver"] = {}
+# 域名 -> [(路径前缀, 解析器)]，按前缀长度降序排列，优先于域名匹配
+_resolvers_by_prefix: dict[str, list[tuple[str, "BaseResolver"]]] = {}
 
 def register_resolver(cls: Type["BaseResolver"]) -> Type["BaseResolver"]:
     """装饰器：注册解析器到全局注册表"""
@@ -95,14 +146,77 @@ def register_resolver(cls: Type["BaseResolver"]) -> Type["BaseResolver"]:
         if isinstance(resolver, cls):
             return cls
     # 创建实例并注册
-    _resolvers_registry.append(cls())
+    resolver = cls()
+    _resolvers_registry.append(resolver)
+    for host in resolver.hosts:
+        _resolvers_by_host.setdefault(host.lower(), resolver)
+    for prefix in resolver.url_prefixes:
+        host, _, path = prefix.partition("/")
+        entries = _resolvers_by_prefix.setdefault(host.lower(), [])
+        entries.append(("/" + path, resolver))
+        entries.sort(key=lambda entry: len(entry[0]), reverse=True)
     return cls
 
+def _match_resolver(url: str) -> Optional["BaseResolver"]:
+    """按域名和路径前缀查找解析器
+
+    只解析一次 URL，依次尝试完整域名及其各级父域名；同一域名下先匹配最长的路径前缀，再匹配域名。
+    """
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname
+    except ValueError:
+        return None
+    path = parts.path or "/"
+    while host:
+        for prefix, resolver in _resolvers_by_prefix.get(host, ()):
+            if path.startswith(prefix):
+                return resolver
+        resolver = _resolvers_by_host.get(host)
+        if resolver is not None:
+            return resolver
+        _, _, host = host.partition(".")
+    return None
+
 class BaseResolver(ABC):
     """解析器基类"""
 
+    hosts: tuple[str, ...] = ()
+    """可处理的域名，子域名也会被匹配（如 bilibili.com 匹配 www.bilibili.com）"""
+
+    url_prefixes: tuple[str, ...] = ()
+    """可处理的 "域名/路径" 前缀（如 example.com/video/），用于同一域名由多个解析器按路径分担的情况"""
+
     _default_user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 
+    _session: Optional[aiohttp.ClientSession] = None
+    """所有解析器共享的HTTP会话，复用连接池、keep-alive和DNS缓存"""
+
+    @classmethod
+    async def get_session(cls) -> aiohttp.ClientSession:
+        """获取共享的 aiohttp.ClientSession，首次调用时创建"""
+        if BaseResolver._session is None or BaseResolver._session.closed:
+            BaseResolver._session = aiohttp.ClientSession(
+                # 缓存DNS解析结果，并限制单个主机的并发连接数，避免被CDN限流
+                connector=aiohttp.TCPConnector(
+                    limit=50,
+                    limit_per_host=8,
+                    use_dns_cache=True,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={'User-Agent': cls._default_user_agent}
+            )
+        return BaseResolver._session
+
+    @classmethod
+    async def close_session(cls):
+        """关闭共享的HTTP会话，插件卸载时调用"""
+        if BaseResolver._session is not None:
+            await BaseResolver._session.close()
+            BaseResolver._session = None
+
     @property
     def headers(self) -> dict[str, str]:
         """返回请求头，子类可以重写此方法自定义headers"""
@@ -141,22 +255,56 @@ class BaseResolver(ABC):
         pass
     
     @abstractmethod
-    async def parse(self, url: str) -> ParseResult:
+    async def parse(self, url: str, session=None) -> ParseResult:
         """解析链接
         
         Args:
             url: 待解析的链接
+            session: 可选的 aiohttp.ClientSession 实例，为空时使用 get_session() 返回的共享会话
             
         Returns:
             解析结果字典
         """
         pass
 
-async def resolve_link(url: str) -> list[ParseResult]:
-    """使用注册的解析器解析链接"""
+# 归一化 URL -> (写入时间, 解析结果)
+_parse_cache: "OrderedDict[str, tuple[float, list[ParseResult]]]" = OrderedDict()
+
+async def resolve_link(url: str, session=None) -> list[ParseResult]:
+    """使用注册的解析器解析链接
+
+    结果按归一化后的 URL 缓存 PARSE_CACHE_TTL 秒，缓存的 ParseResult 在调用方之间共享，不应修改。
+    包含 cacheable 为 False 的结果时不缓存，下次解析重新请求。
+
+    Args:
+        url: 待解析的链接
+        session: 可选的共享 aiohttp.ClientSession 实例，会传递给解析器
+    """
+    key = normalize_url(url)
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        if time.monotonic() - cached[0] <= PARSE_CACHE_TTL:
+            _parse_cache.move_to_end(key)
+            return list(cached[1])
+        del _parse_cache[key]
+
+    results = await _resolve_uncached(url, session)
+    if results and all(result.cacheable for result in results):
+        _parse_cache[key] = (time.monotonic(), results)
+        while len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return list(results)
+
+async def _resolve_uncached(url: str, session=None) -> list[ParseResult]:
+    """查找解析器并解析链接，不经过缓存"""
+    resolver = _match_resolver(url)
+    if resolver is not None:
+        LOG.info(f"Detected URL: {url}")
+        return [await resolver.parse(url, session=session)]
+    # 域名未命中时回退到逐个调用 can_handle
     results = []
     for resolver in _resolvers_registry:
         if resolver.can_handle(url):
             LOG.info(f"Detected URL: {url}")
-            results.append(await resolver.parse(url))
+            results.append(await resolver.parse(url, session=session))
     return results
\ No newline at end of file
@@ -1,20 +1,122 @@
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
+from collections import OrderedDict
+from dataclasses import replace
 from io import BytesIO
 import aiohttp
 import asyncio
-import base64
 import re
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+try:
+    import pybase64 as base64  # SIMD 加速的 base64 实现，接口与标准库一致
+except ImportError:
+    import base64
+try:
+    from orjson import loads as json_loads  # 更快的 JSON 解析
+except ImportError:
+    from json import loads as json_loads
 
 try:
     from .base_resolver import BaseResolver, ParseResult, register_resolver
 except ImportError:
     from base_resolver import BaseResolver, ParseResult, register_resolver
 
+# 预编译的正则表达式
+_BVID_RE = re.compile(r'BV[a-zA-Z0-9]+')
+
+# B站域名，子域名通过 "." 前缀后缀匹配
+_HOSTS = ('bilibili.com', 'b23.tv')
+_HOST_SUFFIXES = tuple(f".{host}" for host in _HOSTS)
+
+# 视频解析结果缓存的过期时间（秒）与容量
+VIEW_CACHE_TTL = 300
+VIEW_CACHE_SIZE = 256
+
+# 头像尺寸与阴影偏移
+AVATAR_SIZE = 80
+AVATAR_SHADOW_OFFSET = 2
+
+
+def _make_avatar_mask(size: int, scale: int = 4) -> Image.Image:
+    """生成抗锯齿的圆形头像遮罩（放大绘制后缩小）"""
+    mask = Image.new('L', (size * scale, size * scale), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size * scale, size * scale), fill=255)
+    return mask.resize((size, size), Image.Resampling.LANCZOS)
+
+
+def _make_avatar_shadow(size: int, offset: int, radius: int) -> Image.Image:
+    """生成头像阴影，阴影形状固定，只需生成一次"""
+    shadow = Image.new('RGBA', (size + offset * 2, size + offset * 2), (0, 0, 0, 0))
+    ImageDraw.Draw(shadow).ellipse(
+        [(offset, offset), (size + offset, size + offset)],
+        fill=(0, 0, 0, 30)
+    )
+    return shadow.filter(ImageFilter.GaussianBlur(radius=radius))
+
+
+def _hostname(url: str) -> str:
+    """提取小写主机名，无法解析时返回空字符串"""
+    try:
+        return urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+
+
+def _make_emoji_tile(icon: str, font) -> Optional[tuple[Image.Image, Image.Image, tuple[int, int]]]:
+    """预先渲染彩色emoji图块
+
+    Args:
+        icon: emoji字符
+        font: emoji字体
+
+    Returns:
+        (RGB图块, 遮罩, 相对绘制坐标的偏移)，字形为空时返回None
+    """
+    left, top, right, bottom = ImageDraw.Draw(Image.new('RGBA', (1, 1))).textbbox(
+        (0, 0), icon, font=font, embedded_color=True
+    )
+    if right <= left or bottom <= top:
+        return None
+    tile = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+    ImageDraw.Draw(tile).text((-left, -top), icon, font=font, embedded_color=True)
+    # 在透明底上绘制得到的是预乘alpha的颜色，按 RGBa 重新解释后还原，
+    # 再拆成颜色和遮罩，粘贴结果与直接 draw.text 一致
+    tile = Image.frombytes('RGBa', tile.size, tile.tobytes()).convert('RGBA')
+    return tile.convert('RGB'), tile.getchannel('A'), (left, top)
+
 
 @register_resolver
 class BilibiliResolver(BaseResolver):
     """Bilibili链接解析器"""
 
+    hosts = _HOSTS
+
+    # 信息图字体缓存，由 _ensure_fonts 加载
+    _fonts_loaded = False
+    _fonts_lock = threading.Lock()
+    _font_large = _font_medium = _font_small = _font_small_bold = _font_emoji = None
+    # emoji -> (图块, 遮罩, 偏移)，彩色emoji光栅化较慢，随字体一起预渲染一次
+    _emoji_tiles: dict[str, Optional[tuple[Image.Image, Image.Image, tuple[int, int]]]] = {}
+    
+    # BV号 -> (写入时间, 解析结果)，同一视频的不同链接形式（含短链）共享
+    _view_cache: "OrderedDict[str, tuple[float, ParseResult]]" = OrderedDict()
+    
+    # 信息图统计数据布局: (列, 行, 图标, 名称, stats键)
+    _STAT_LAYOUT = (
+        (0, 0, "👍", "点赞", 'like'),
+        (0, 1, "🪙", "投币", 'coin'),
+        (0, 2, "⭐", "收藏", 'favorite'),
+        (1, 0, "▶️", "播放", 'view'),
+        (1, 1, "💬", "弹幕", 'danmaku'),
+        (1, 2, "💭", "评论", 'reply'),
+    )
+    
+    # 固定不变的头像遮罩和阴影
+    _avatar_mask = _make_avatar_mask(AVATAR_SIZE)
+    _avatar_shadow = _make_avatar_shadow(AVATAR_SIZE, AVATAR_SHADOW_OFFSET, radius=3)
+
     @property
     def headers(self) -> dict[str, str]:
         """B站请求头"""
@@ -24,12 +126,14 @@ class BilibiliResolver(BaseResolver):
         }
 
     def can_handle(self, url: str) -> bool:
-        return "bilibili.com" in url or "b23.tv" in url
+        # 只匹配主机名，避免 https://evil.com/?ref=bilibili.com 之类的误判
+        host = _hostname(url)
+        return host in _HOSTS or host.endswith(_HOST_SUFFIXES)
     
     def _extract_bvid(self, url: str) -> str:
         """从URL中提取BV号"""
         # 匹配 BV 号
-        match = re.search(r'BV[a-zA-Z0-9]+', url)
+        match = _BVID_RE.search(url)
         if match:
             return match.group(0)
         raise Exception("无法从URL中提取BV号")
@@ -47,119 +151,174 @@ class BilibiliResolver(BaseResolver):
         except Exception:
             return url
 
-    async def parse(self, url: str) -> ParseResult:
+    async def parse(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> ParseResult:
         """解析Bilibili链接"""
         try:
-            # 使用B站API获取视频信息
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession() as session:
-                # 如果是 b23.tv 短链，先还原为长链再提取 BV 号
-                expanded_url = url
-                if 'b23.tv' in url:
-                    expanded_url = await self._expand_short_url(url, session, timeout)
-
-                # 提取BV号
-                bvid = self._extract_bvid(expanded_url)
-
-                api_url = f"https://api.bilibili.com/x/web-interface/view?bvid={bvid}"
-                async with session.get(api_url, headers=self.headers, timeout=timeout) as response:
-                    if response.status != 200:
-                        raise Exception(f"HTTP {response.status}")
-                    
-                    data = await response.json()
-                    
-                    # 检查API返回状态
-                    if data.get('code') != 0:
-                        raise Exception(f"API错误: {data.get('message', '未知错误')}")
-                    
-                    video_data = data.get('data', {})
-                    
-                    # 获取视频封面图片并转换为base64
-                    pic_url = video_data.get('pic', '')
-                    banner_b64 = ''
-                    if pic_url:
-                        try:
-                            async with session.get(pic_url, timeout=timeout) as pic_response:
-                                if pic_response.status == 200:
-                                    pic_data = await pic_response.read()
-                                    banner_b64 = base64.b64encode(pic_data).decode('utf-8')
-                        except Exception:
-                            pass  # 如果获取封面失败,使用空字符串
-                    
-                    # 提取数据
-                    owner = video_data.get('owner', {})
-                    stat = video_data.get('stat', {})
-                    
-                    # 构建详细的描述信息
-                    author_name = owner.get('name', '未知作者')
-                    view_count = stat.get('view', 0)
-                    like_count = stat.get('like', 0)
-                    coin_count = stat.get('coin', 0)
-                    favorite_count = stat.get('favorite', 0)
-                    share_count = stat.get('share', 0)
-                    danmaku_count = stat.get('danmaku', 0)
-                    reply_count = stat.get('reply', 0)
-                    
-                    description = video_data.get('desc', '')
-                    
-                    # 获取作者头像数据用于绘制信息图
-                    face_url = owner.get('face', '')
-                    face_data = None
-                    if face_url:
-                        try:
-                            async with session.get(face_url, timeout=timeout) as face_response:
-                                if face_response.status == 200:
-                                    face_data = await face_response.read()
-                        except Exception:
-                            pass
-                    
-                    # 构建metadata（不包含二进制数据）
-                    metadata = {
-                        'author': {
-                            'name': author_name,
-                            'mid': owner.get('mid', ''),
-                            'face': face_url,
-                            'face_data': face_data  # 临时保存用于绘图
-                        },
-                        'stats': {
-                            'view': view_count,
-                            'like': like_count,
-                            'coin': coin_count,
-                            'favorite': favorite_count,
-                            'share': share_count,
-                            'danmaku': danmaku_count,
-                            'reply': reply_count
-                        },
-                        'video_info': {
-                            'bvid': video_data.get('bvid', ''),
-                            'aid': video_data.get('aid', ''),
-                            'duration': video_data.get('duration', 0),
-                            'pubdate': video_data.get('pubdate', 0),
-                            'tname': video_data.get('tname', '')
-                        }
-                    }
-                    
-                    # 生成信息图
-                    info_pic_b64 = self.draw_info_pic(metadata)
-                    
-                    # 从metadata中移除临时的face_data
-                    del metadata['author']['face_data']
-                    
-                    return ParseResult(
-                        title=video_data.get('title', ''),
-                        banner_b64=banner_b64,
-                        description=description,
-                        url=url,
-                        platform='bilibili',
-                        metadata=metadata,
-                        pre_init_images=[info_pic_b64],
-                        card_color=(251, 239, 243)  # B站粉色主题色
-                    )
+            if session is None:
+                session = await self.get_session()
+            return await self._parse(url, session)
         except aiohttp.ClientError as e:
             raise Exception(f"网络请求失败: {str(e)}")
         except Exception as e:
             raise Exception(f"解析失败: {str(e)}")
+
+    async def _fetch_bytes(self, session: aiohttp.ClientSession, url: str, timeout: aiohttp.ClientTimeout) -> Optional[bytes]:
+        """下载图片等二进制资源，失败时返回None"""
+        if not url:
+            return None
+        try:
+            async with session.get(url, headers=self.headers, timeout=timeout) as response:
+                if response.status == 200:
+                    return await response.read()
+        except Exception:
+            pass
+        return None
+
+    async def _parse(self, url: str, session: aiohttp.ClientSession) -> ParseResult:
+        """使用给定会话请求B站API并构建解析结果"""
+        # 使用B站API获取视频信息
+        timeout = aiohttp.ClientTimeout(total=10)
+        # 如果是 b23.tv 短链，先还原为长链再提取 BV 号
+        expanded_url = url
+        host = _hostname(url)
+        if host == 'b23.tv' or host.endswith('.b23.tv'):
+            expanded_url = await self._expand_short_url(url, session, timeout)
+
+        # 提取BV号
+        bvid = self._extract_bvid(expanded_url)
+
+        # 命中缓存时跳过网络请求和绘图
+        cached = self._view_cache.get(bvid)
+        if cached is not None:
+            if time.monotonic() - cached[0] <= VIEW_CACHE_TTL:
+                self._view_cache.move_to_end(bvid)
+                return replace(cached[1], url=url)
+            del self._view_cache[bvid]
+
+        api_url = f"https://api.bilibili.com/x/web-interface/view?bvid={bvid}"
+        async with session.get(api_url, headers=self.headers, timeout=timeout, raise_for_status=True) as response:
+            data = json_loads(await response.read())
+        
+        # 检查API返回状态
+        if data.get('code') != 0:
+            raise Exception(f"API错误: {data.get('message', '未知错误')}")
+        
+        video_data = data.get('data', {})
+        
+        # 提取数据
+        owner = video_data.get('owner', {})
+        stat = video_data.get('stat', {})
+        
+        # 并发获取视频封面和作者头像（失败时分别为None）
+        pic_url = video_data.get('pic', '')
+        face_url = owner.get('face', '')
+        pic_data, face_data = await asyncio.gather(
+            self._fetch_bytes(session, pic_url, timeout),
+            self._fetch_bytes(session, face_url, timeout)
+        )
+        
+        # 构建详细的描述信息
+        author_name = owner.get('name', '未知作者')
+        view_count = stat.get('view', 0)
+        like_count = stat.get('like', 0)
+        coin_count = stat.get('coin', 0)
+        favorite_count = stat.get('favorite', 0)
+        share_count = stat.get('share', 0)
+        danmaku_count = stat.get('danmaku', 0)
+        reply_count = stat.get('reply', 0)
+        
+        description = video_data.get('desc', '')
+        
+        # 构建metadata（不包含二进制数据）
+        metadata = {
+            'author': {
+                'name': author_name,
+                'mid': owner.get('mid', ''),
+                'face': face_url,
+                'face_data': face_data  # 临时保存用于绘图
+            },
+            'stats': {
+                'view': view_count,
+                'like': like_count,
+                'coin': coin_count,
+                'favorite': favorite_count,
+                'share': share_count,
+                'danmaku': danmaku_count,
+                'reply': reply_count
+            },
+            'video_info': {
+                'bvid': video_data.get('bvid', ''),
+                'aid': video_data.get('aid', ''),
+                'duration': video_data.get('duration', 0),
+                'pubdate': video_data.get('pubdate', 0),
+                'tname': video_data.get('tname', '')
+            }
+        }
+        
+        # 生成信息图（Pillow绘制，放到线程中执行避免阻塞事件循环）
+        info_pic_b64 = await asyncio.to_thread(self.draw_info_pic, metadata)
+        
+        # 从metadata中移除临时的face_data
+        del metadata['author']['face_data']
         
+        # 封面或头像下载失败时结果不完整，不缓存，下次分享时重新获取
+        complete = (not pic_url or pic_data is not None) and (not face_url or face_data is not None)
+        
+        result = ParseResult(
+            title=video_data.get('title', ''),
+            banner_b64='',
+            banner_bytes=pic_data,  # 直接传递原始封面数据，省去base64编解码
+            description=description,
+            url=url,
+            platform='bilibili',
+            metadata=metadata,
+            pre_init_images=[info_pic_b64],
+            card_color=(251, 239, 243),  # B站粉色主题色
+            cacheable=complete
+        )
+        
+        if complete:
+            self._view_cache[bvid] = (time.monotonic(), result)
+            while len(self._view_cache) > VIEW_CACHE_SIZE:
+                self._view_cache.popitem(last=False)
+        return result
+        
+    @classmethod
+    def _ensure_fonts(cls):
+        """加载并缓存绘制信息图所需的字体，避免每次绘制都重新读取字体文件"""
+        if cls._fonts_loaded:
+            return
+        with cls._fonts_lock:
+            if cls._fonts_loaded:
+                return
+            # 加载字体(尝试使用系统字体,失败则使用默认字体)
+            try:
+                cls._font_large = ImageFont.truetype("msyh.ttc", 24)  # 微软雅黑
+                cls._font_medium = ImageFont.truetype("msyh.ttc", 18)
+                cls._font_small = ImageFont.truetype("msyh.ttc", 14)
+                cls._font_small_bold = ImageFont.truetype("msyhbd.ttc", 14)  # 微软雅黑粗体
+            except:
+                cls._font_large = ImageFont.load_default()
+                cls._font_medium = ImageFont.load_default()
+                cls._font_small = ImageFont.load_default()
+                cls._font_small_bold = ImageFont.load_default()
+            
+            # 尝试加载emoji字体 - 使用较大尺寸以显示彩色emoji
+            try:
+                # Windows 10/11 自带的emoji字体,使用更大尺寸
+                cls._font_emoji = ImageFont.truetype("seguiemj.ttf", 16)
+            except:
+                try:
+                    # 备用: Segoe UI Symbol
+                    cls._font_emoji = ImageFont.truetype("seguisym.ttf", 16)
+                except:
+                    cls._font_emoji = cls._font_small  # 如果加载失败,使用普通字体
+            cls._emoji_tiles = {
+                icon: _make_emoji_tile(icon, cls._font_emoji)
+                for _, _, icon, _, _ in cls._STAT_LAYOUT
+            }
+            cls._fonts_loaded = True
+
     def draw_info_pic(self, metadata: dict) -> str:
         """绘制视频信息图片
         
@@ -170,37 +329,29 @@ class BilibiliResolver(BaseResolver):
             PNG图片的base64编码字符串
         """
         # 图片尺寸和边距
-        width = 900
         height = 120
         padding = 15
         col_spacing = 20
         
-        # 创建白色背景图片
+        # 数据列布局
+        col2_x = 340
+        col_width = 160
+        col3_x = col2_x + col_width + col_spacing
+        icon_offset = 25  # 图标后文字的偏移
+        
+        # 图片宽度: 第三列的最右侧位置 + 一些文字的估计宽度 + 右边距
+        max_text_width = 120  # 估计"播放 999,999"这类文本的最大宽度
+        width = col3_x + icon_offset + max_text_width + padding
+        
+        # 按最终宽度直接创建白色背景图片，无需绘制后再裁剪
         img = Image.new('RGBA', (width, height), (255, 255, 255, 255))
         draw = ImageDraw.Draw(img)
         
-        # 加载字体(尝试使用系统字体,失败则使用默认字体)
-        try:
-            font_large = ImageFont.truetype("msyh.ttc", 24)  # 微软雅黑
-            font_medium = ImageFont.truetype("msyh.ttc", 18)
-            font_small = ImageFont.truetype("msyh.ttc", 14)
-            font_small_bold = ImageFont.truetype("msyhbd.ttc", 14)  # 微软雅黑粗体
-        except:
-            font_large = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-            font_small_bold = ImageFont.load_default()
-        
-        # 尝试加载emoji字体 - 使用较大尺寸以显示彩色emoji
-        try:
-            # Windows 10/11 自带的emoji字体,使用更大尺寸
-            font_emoji = ImageFont.truetype("seguiemj.ttf", 16)
-        except:
-            try:
-                # 备用: Segoe UI Symbol
-                font_emoji = ImageFont.truetype("seguisym.ttf", 16)
-            except:
-                font_emoji = font_small  # 如果加载失败,使用普通字体
+        # 字体只在首次绘制时加载一次
+        self._ensure_fonts()
+        font_large = self._font_large
+        font_small = self._font_small
+        font_small_bold = self._font_small_bold
         
         # 获取数据
         author = metadata.get('author', {})
@@ -209,47 +360,29 @@ class BilibiliResolver(BaseResolver):
         author_name = author.get('name', '未知')
         mid = author.get('mid', '')
         avatar_data = author.get('face_data', None)  # 从metadata中获取头像数据
-        view = stats.get('view', 0)
-        like = stats.get('like', 0)
-        coin = stats.get('coin', 0)
-        favorite = stats.get('favorite', 0)
-        danmaku = stats.get('danmaku', 0)
-        reply = stats.get('reply', 0)
         
         # 第一列: 头像和作者信息
-        avatar_size = 80
+        avatar_size = AVATAR_SIZE
         avatar_x = padding
         avatar_y = (height - avatar_size) // 2
         
         if avatar_data:
             try:
                 # 加载头像
-                avatar_img = Image.open(BytesIO(avatar_data)).convert('RGBA')
-                avatar_img = avatar_img.resize((avatar_size, avatar_size), Image.Resampling.LANCZOS)
-                
-                # 创建圆形遮罩
-                mask = Image.new('L', (avatar_size, avatar_size), 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse((0, 0, avatar_size, avatar_size), fill=255)
+                avatar_img = Image.open(BytesIO(avatar_data))
+                # JPEG头像在解码时直接按DCT缩放到接近目标尺寸，缩小后的图用BILINEAR即可
+                avatar_img.draft('RGB', (avatar_size * 2, avatar_size * 2))
+                avatar_img = avatar_img.convert('RGBA').resize((avatar_size, avatar_size), Image.Resampling.BILINEAR)
                 
-                # 创建圆形头像
-                circle_avatar = Image.new('RGBA', (avatar_size, avatar_size), (0, 0, 0, 0))
-                circle_avatar.paste(avatar_img, (0, 0))
-                circle_avatar.putalpha(mask)
+                # 创建圆形头像（resize 返回的是新图片，可直接替换其alpha通道）
+                avatar_img.putalpha(self._avatar_mask)
                 
                 # 添加阴影效果
-                shadow_offset = 2
-                shadow = Image.new('RGBA', (avatar_size + shadow_offset * 2, avatar_size + shadow_offset * 2), (0, 0, 0, 0))
-                shadow_draw = ImageDraw.Draw(shadow)
-                shadow_draw.ellipse(
-                    [(shadow_offset, shadow_offset), (avatar_size + shadow_offset, avatar_size + shadow_offset)],
-                    fill=(0, 0, 0, 30)
-                )
-                shadow = shadow.filter(ImageFilter.GaussianBlur(radius=3))
-                img.paste(shadow, (avatar_x - shadow_offset, avatar_y - shadow_offset), shadow)
+                shadow = self._avatar_shadow
+                img.paste(shadow, (avatar_x - AVATAR_SHADOW_OFFSET, avatar_y - AVATAR_SHADOW_OFFSET), shadow)
                 
                 # 粘贴圆形头像
-                img.paste(circle_avatar, (avatar_x, avatar_y), circle_avatar)
+                img.paste(avatar_img, (avatar_x, avatar_y), avatar_img)
                 
                 # 添加边框
                 draw.ellipse(
@@ -282,85 +415,42 @@ class BilibiliResolver(BaseResolver):
         draw.text((text_x, name_y), author_name, fill=(0, 0, 0, 255), font=font_large)
         draw.text((text_x, uid_y), f"UID: {mid}", fill=(128, 128, 128, 255), font=font_small)
         
-        # 第二列: 点赞、投币、收藏
-        col2_x = 340
-        col_width = 160
-        
+        # 第二、三列: 统计数据
         row_height = 26
         # 让数据列垂直居中对齐头像区域
         start_y = avatar_y + 10
+        col_xs = (col2_x, col3_x)
         
-        # 绘制图标和文字 - 使用embedded_color支持彩色emoji
-        icon_offset = 25  # 图标后文字的偏移
+        # 绘制图标和文字 - 图标使用预渲染的彩色emoji图块
         text_offset = -4  # 文字垂直偏移,使其与emoji中心对齐
         
-        # 点赞
-        draw.text((col2_x, start_y), "👍", font=font_emoji, embedded_color=True)
-        self._draw_text_with_bold_numbers((col2_x + icon_offset, start_y + text_offset), f"点赞 {self._format_number_with_comma(like)}", draw, font_small, font_small_bold)
-        
-        # 投币
-        draw.text((col2_x, start_y + row_height), "🪙", font=font_emoji, embedded_color=True)
-        self._draw_text_with_bold_numbers((col2_x + icon_offset, start_y + row_height + text_offset), f"投币 {self._format_number_with_comma(coin)}", draw, font_small, font_small_bold)
-        
-        # 收藏
-        draw.text((col2_x, start_y + row_height * 2), "⭐", font=font_emoji, embedded_color=True)
-        self._draw_text_with_bold_numbers((col2_x + icon_offset, start_y + row_height * 2 + text_offset), f"收藏 {self._format_number_with_comma(favorite)}", draw, font_small, font_small_bold)
-        
-        # 第三列: 播放、弹幕、评论
-        col3_x = col2_x + col_width + col_spacing
-        
-        # 播放
-        draw.text((col3_x, start_y), "▶️", font=font_emoji, embedded_color=True)
-        self._draw_text_with_bold_numbers((col3_x + icon_offset, start_y + text_offset), f"播放 {self._format_number_with_comma(view)}", draw, font_small, font_small_bold)
+        emoji_tiles = self._emoji_tiles
+        draw_stat = self._draw_label_number
+        for col, row, icon, label, key in self._STAT_LAYOUT:
+            x = col_xs[col]
+            y = start_y + row_height * row
+            emoji_tile = emoji_tiles[icon]
+            if emoji_tile is not None:
+                tile, mask, (dx, dy) = emoji_tile
+                img.paste(tile, (x + dx, y + dy), mask)
+            draw_stat((x + icon_offset, y + text_offset), label, f"{stats.get(key, 0):,}", draw, font_small, font_small_bold)
         
-        # 弹幕
-        draw.text((col3_x, start_y + row_height), "💬", font=font_emoji, embedded_color=True)
-        self._draw_text_with_bold_numbers((col3_x + icon_offset, start_y + row_height + text_offset), f"弹幕 {self._format_number_with_comma(danmaku)}", draw, font_small, font_small_bold)
-        
-        # 评论
-        draw.text((col3_x, start_y + row_height * 2), "💭", font=font_emoji, embedded_color=True)
-        self._draw_text_with_bold_numbers((col3_x + icon_offset, start_y + row_height * 2 + text_offset), f"评论 {self._format_number_with_comma(reply)}", draw, font_small, font_small_bold)
-        
-        # 计算实际使用的宽度并裁剪图片
-        # 第三列的最右侧位置 + 一些文字的估计宽度 + 右边距
-        max_text_width = 120  # 估计"播放 999,999"这类文本的最大宽度
-        actual_width = col3_x + icon_offset + max_text_width + padding
-        
-        # 裁剪图片到实际使用的宽度
-        img = img.crop((0, 0, actual_width, height))
+        # 背景不透明，去掉alpha通道后以低压缩级别编码，速度快得多
+        img = img.convert('RGB')
         
         # 转换为base64
         output = BytesIO()
-        img.save(output, format='PNG')
+        img.save(output, format='PNG', optimize=False, compress_level=1)
         img_bytes = output.getvalue()
-        return base64.b64encode(img_bytes).decode('utf-8')
-    
-    def _format_number_with_comma(self, num: int) -> str:
-        """格式化数字显示为带千位分隔符的格式"""
-        return f"{num:,}"
+        return base64.b64encode(img_bytes).decode('ascii')
     
-    def _draw_text_with_bold_numbers(self, pos: tuple, text: str, draw, font_normal, font_bold):
-        """绘制文本,其中数字使用粗体字体"""
+    def _draw_label_number(self, pos: tuple, label: str, number_str: str, draw, font_normal, font_bold):
+        """绘制"名称 数字"文本,其中数字使用粗体字体"""
         x, y = pos
-        
-        # 使用正则表达式分割文本为文字和数字部分
-        parts = re.split(r'(\d+(?:,\d{3})*)', text)
-        
-        for part in parts:
-            if not part:
-                continue
-            
-            # 判断是否为数字(包含逗号的数字)
-            if re.match(r'^\d+(?:,\d{3})*$', part):
-                # 数字部分使用粗体
-                draw.text((x, y), part, fill=(0, 0, 0, 255), font=font_bold)
-            else:
-                # 文字部分使用普通字体
-                draw.text((x, y), part, fill=(0, 0, 0, 255), font=font_normal)
-            
-            # 计算当前部分的宽度,更新x坐标
-            bbox = draw.textbbox((0, 0), part, font=font_bold if re.match(r'^\d+(?:,\d{3})*$', part) else font_normal)
-            x += bbox[2] - bbox[0]
+        label = f"{label} "
+        draw.text((x, y), label, fill=(0, 0, 0, 255), font=font_normal)
+        x += draw.textlength(label, font=font_normal)
+        draw.text((x, y), number_str, fill=(0, 0, 0, 255), font=font_bold)
     
 if __name__ == "__main__":
     async def test():
@@ -386,5 +476,8 @@ if __name__ == "__main__":
                 print("图片已在默认查看器中打开")
             except Exception as e:
                 print(f"显示图片失败: {e}")
+        
+        # parse 未传入 session 时会创建共享会话，测试结束后关闭
+        await BaseResolver.close_session()
     
     asyncio.run(test())
@@ -2,10 +2,42 @@
 
 from ncatbot.plugin_system import NcatBotPlugin
 from functools import wraps
-from typing import Callable
-import re
+from typing import Callable, Iterator
+
+# URL 中允许出现的字符
+_URL_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-()@:%_+.~#?&/=")
+
+
+def iter_urls(text: str) -> Iterator[str]:
+    """逐个产出文本中的 URL
+
+    使用 str.find 定位协议头后逐字符扫描，避免每条消息都走正则引擎。
+    
+    Args:
+        text: 待提取的文本
+        
+    Yields:
+        URL
+    """
+    n = len(text)
+    pos = text.find("http")
+    while pos != -1:
+        if text.startswith("https://", pos):
+            start = pos + 8
+        elif text.startswith("http://", pos):
+            start = pos + 7
+        else:
+            pos = text.find("http", pos + 4)
+            continue
+        end = start
+        while end < n and text[end] in _URL_CHARS:
+            end += 1
+        # 主机名中至少需要一个点
+        host = text[start:end].split("/", 1)[0]
+        if "." in host.strip("."):
+            yield text[pos:end]
+        pos = text.find("http", max(end, pos + 4))
 
-URLPATTERN = r'https?://(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&/=]*)'
 
 def extract_urls(text: str) -> list[str]:
     """从文本中提取所有 URL
@@ -16,20 +48,47 @@ def extract_urls(text: str) -> list[str]:
     Returns:
         URL 列表
     """
-    return re.findall(URLPATTERN, text)
+    return list(iter_urls(text))
+
 
+# id(订阅列表) -> (订阅列表, ID集合)；保存列表本身用于校验身份，避免 id 被复用
+_SUB_CACHE: dict[int, tuple[list, frozenset[str]]] = {}
 
-def subscribed_check(subscribed_groups: list, group_id: str) -> bool:
-    """检查群组是否已订阅
+
+def subscription_set(subscribed: list) -> frozenset[str]:
+    """获取订阅列表对应的ID集合
+
+    集合按列表身份缓存，配置中的列表被整体替换时自动重建；原地修改列表后需调用 invalidate_subscription。
     
     Args:
-        subscribed_groups: 已订阅的群组列表
-        group_id: 群组ID
+        subscribed: 配置中的订阅列表
+        
+    Returns:
+        字符串形式的ID集合
+    """
+    cached = _SUB_CACHE.get(id(subscribed))
+    if cached is None or cached[0] is not subscribed:
+        cached = (subscribed, frozenset(map(str, subscribed)))
+        _SUB_CACHE[id(subscribed)] = cached
+    return cached[1]
+
+
+def invalidate_subscription(subscribed: list):
+    """原地修改订阅列表后使对应的ID集合缓存失效"""
+    _SUB_CACHE.pop(id(subscribed), None)
+
+
+def subscribed_check(subscribed: list, target_id: str) -> bool:
+    """检查群组或私聊用户是否已订阅
+    
+    Args:
+        subscribed: 配置中的订阅列表
+        target_id: 群组ID或用户ID
         
     Returns:
         是否已订阅
     """
-    return str(group_id) in [str(g) for g in subscribed_groups]
+    return str(target_id) in subscription_set(subscribed)
 
 
 def require_subscription(func: Callable):
@@ -40,19 +99,22 @@ def require_subscription(func: Callable):
     @wraps(func)
     async def wrapper(self: NcatBotPlugin, event, *args, **kwargs):
         group_id = getattr(event, "group_id", None)
-        user_id = getattr(event, "user_id", None)
         
         # 群聊消息
         if group_id is not None:
-            if not subscribed_check(self.config.get("subscribed_groups", []), str(group_id)):
+            if not subscribed_check(self.config["subscribed_groups"], group_id):
                 # 未订阅的群组，不执行
                 return None
+            return await func(self, event, *args, **kwargs)
+        
         # 私聊消息
-        elif user_id is not None:
-            subscribed_privates = self.config.get("subscribed_privates", [])
-            if str(user_id) not in [str(u) for u in subscribed_privates]:
-                # 未订阅的私聊用户，不执行
-                return None
+        user_id = getattr(event, "user_id", None)
+        if user_id is None:
+            # 无法判断来源的事件，不执行
+            return None
+        if not subscribed_check(self.config["subscribed_privates"], user_id):
+            # 未订阅的私聊用户，不执行
+            return None
         
         return await func(self, event, *args, **kwargs)
     